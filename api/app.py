@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from api.routes.documents import router as documents_router
 from api.routes.jobs import router as jobs_router
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Reading Assistant API", version="0.1.0")
+    app = FastAPI(title="Reading Assistant API", version="0.1.0", default_response_class=ORJSONResponse)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -2,47 +2,186 @@ from __future__ import annotations
 
 import hashlib
 import os
+import re
 from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+from blake3 import blake3
+from sqlalchemy.engine import Engine
 
 from reading_assistant.parsing import (
     DoclingParsingEngine,
     LocalBookStorage,
+    LocalParseCache,
     ParsingRepository,
     ParsingWorker,
+    RQJobQueue,
     SqlAlchemyParsingRepository,
     StoragePaths,
     WhooshIndexer,
+    WorkerConfig,
+    create_database_engine,
 )
+from reading_assistant.parsing.job_queue import DEFAULT_JOB_TIMEOUT_S
+
+
+def get_database_url() -> str:
+    return os.getenv("DATABASE_URL", "sqlite+pysqlite:///./data/reading_assistant.db")
 
 
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """
+    Process-wide SQLAlchemy engine. HTTP handlers and background jobs share
+    its connection pool instead of re-opening the database per request.
+    """
+    # SQLite connection PRAGMAs (WAL etc.) are applied by the repository.
+    return create_database_engine(get_database_url(), **get_db_pool_settings())
+
+
+def get_db_pool_settings() -> dict:
+    # Shipped to RQ workers too (WorkerConfig), so both build the same pool.
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    }
+
+
+# Routes receive these through `Depends(...)`, so they can be swapped with
+# `app.dependency_overrides`. The repository opens a short-lived session per
+# call on the shared pool, so one instance serves concurrent requests.
 @lru_cache(maxsize=1)
 def get_repo() -> ParsingRepository:
-    db_url = os.getenv("DATABASE_URL", "sqlite+pysqlite:///./data/reading_assistant.db")
-    return SqlAlchemyParsingRepository(db_url)
+    return SqlAlchemyParsingRepository(engine=get_engine())
 
 
 @lru_cache(maxsize=1)
 def get_storage() -> LocalBookStorage:
     root = Path(os.getenv("BOOK_STORAGE_ROOT", "./data"))
-    return LocalBookStorage(StoragePaths(root))
+    return LocalBookStorage(StoragePaths(root), render_workers=get_render_workers())
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes")
+
+
+def _whoosh_writer_settings() -> dict:
+    return {
+        "limitmb": int(os.getenv("WHOOSH_LIMITMB", "512")),
+        "procs": int(os.getenv("WHOOSH_PROCS", "4")),
+        "multisegment": _env_flag("WHOOSH_MULTISEGMENT", True),
+    }
 
 
 @lru_cache(maxsize=1)
 def get_indexer() -> WhooshIndexer:
     whoosh_dir = Path(os.getenv("WHOOSH_DIR", "./data/whoosh"))
-    return WhooshIndexer(whoosh_dir)
+    return WhooshIndexer(whoosh_dir, **_whoosh_writer_settings())
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> Optional[RQJobQueue]:
+    """
+    Redis-backed queue used when REDIS_URL is set. Without it, uploads fall
+    back to in-process background tasks (handy for local runs).
+    """
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+    return RQJobQueue(
+        redis_url=redis_url,
+        queue_name=os.getenv("PARSE_QUEUE_NAME", "parse-jobs"),
+        job_timeout=int(os.getenv("PARSE_JOB_TIMEOUT_S", str(DEFAULT_JOB_TIMEOUT_S))),
+    )
+
+
+def get_engine_version() -> str:
+    return os.getenv("ENGINE_VERSION", "docling-latest")
+
+
+def get_page_workers() -> int:
+    # Processes used to convert page ranges of one large PDF in parallel.
+    return int(os.getenv("PARSE_PAGE_WORKERS", "1"))
+
+
+def get_render_workers() -> int:
+    # Processes used to rasterise page previews of one PDF in parallel.
+    return int(os.getenv("RENDER_WORKERS", "1"))
+
+
+def get_pdf_backend() -> str:
+    # "pypdfium" (fast, low memory) or "docling_parse" (best table fidelity).
+    return os.getenv("PDF_BACKEND", "pypdfium")
+
+
+def get_parse_device() -> str:
+    # Accelerator for Docling models and RapidOCR: auto, cpu, cuda, cuda:N or mps.
+    return os.getenv("PARSE_DEVICE", "auto")
+
+
+def get_ocr_model_paths() -> dict:
+    # Replacement RapidOCR ONNX models (e.g. INT8 builds); unset keeps the bundled ones.
+    return {
+        "ocr_det_model_path": os.getenv("OCR_DET_MODEL_PATH") or None,
+        "ocr_rec_model_path": os.getenv("OCR_REC_MODEL_PATH") or None,
+        "ocr_cls_model_path": os.getenv("OCR_CLS_MODEL_PATH") or None,
+    }
+
+
+def get_parse_cache() -> Optional[LocalParseCache]:
+    # Opt-in: re-uploads of an already parsed PDF skip the Docling run.
+    cache_dir = os.getenv("PARSE_CACHE_DIR")
+    return LocalParseCache(Path(cache_dir)) if cache_dir else None
+
+
+def build_worker_config(perform_ocr: bool) -> WorkerConfig:
+    """
+    Serializable worker settings shipped with each queued job so RQ workers
+    build the same pipeline as the in-process path.
+    """
+    whoosh = _whoosh_writer_settings()
+    pool = get_db_pool_settings()
+    return WorkerConfig(
+        database_url=get_database_url(),
+        book_storage_root=os.getenv("BOOK_STORAGE_ROOT", "./data"),
+        whoosh_index_dir=os.getenv("WHOOSH_DIR", "./data/whoosh"),
+        perform_ocr=perform_ocr,
+        engine_version=get_engine_version(),
+        page_workers=get_page_workers(),
+        render_workers=get_render_workers(),
+        pdf_backend=get_pdf_backend(),
+        generate_asset_images=_env_flag("GENERATE_ASSET_IMAGES", False),
+        parse_cache_dir=os.getenv("PARSE_CACHE_DIR") or None,
+        device=get_parse_device(),
+        **get_ocr_model_paths(),
+        batch_size=int(os.getenv("WORKER_BATCH_SIZE", "25")),
+        persist_engine_output=True,
+        render_page_previews=True,
+        whoosh_limitmb=whoosh["limitmb"],
+        whoosh_procs=whoosh["procs"],
+        whoosh_multisegment=whoosh["multisegment"],
+        db_pool_size=pool["pool_size"],
+        db_max_overflow=pool["max_overflow"],
+    )
 
 
 def build_worker(perform_ocr: bool) -> ParsingWorker:
     storage = get_storage()
     indexer = get_indexer()
-    db_url = os.getenv("DATABASE_URL", "sqlite+pysqlite:///./data/reading_assistant.db")
+    repo = get_repo()
     batch_size = int(os.getenv("WORKER_BATCH_SIZE", "25"))
-    engine_version = os.getenv("ENGINE_VERSION", "docling-latest")
 
-    repo = SqlAlchemyParsingRepository(db_url)
-    engine = DoclingParsingEngine(perform_ocr=perform_ocr, engine_version=engine_version)
+    engine = DoclingParsingEngine(
+        perform_ocr=perform_ocr,
+        engine_version=get_engine_version(),
+        page_workers=get_page_workers(),
+        backend=get_pdf_backend(),
+        generate_images=_env_flag("GENERATE_ASSET_IMAGES", False),
+        cache=get_parse_cache(),
+        device=get_parse_device(),
+        **get_ocr_model_paths(),
+    )
     return ParsingWorker(
         repository=repo,
         storage=storage,
@@ -54,12 +193,21 @@ def build_worker(perform_ocr: bool) -> ParsingWorker:
     )
 
 
+# One C-level pass equivalent to `ch if ch.isalnum() else "-"` per character:
+# \w is Unicode alphanumerics plus "_", so non-ASCII (e.g. Chinese) titles survive.
+_SLUG_RE = re.compile(r"[\W_]")
+
+
+def new_content_hasher() -> blake3:
+    """
+    Hasher for uploaded PDF bytes. The digest is stored in `BookRecord.file_md5`,
+    which is kept as the column name but holds an opaque BLAKE3 content hash.
+    """
+    return blake3(max_threads=blake3.AUTO)
+
+
 def build_book_id(title: str) -> str:
     normalized = title.strip().lower()
-    slug = "".join(ch if ch.isalnum() else "-" for ch in normalized).strip("-") or "book"
+    slug = _SLUG_RE.sub("-", normalized).strip("-") or "book"
     digest = hashlib.md5(normalized.encode("utf-8")).hexdigest()[:8]
     return f"{slug}-{digest}"
-
-
-def compute_md5_bytes(data: bytes) -> str:
-    return hashlib.md5(data).hexdigest()
@@ -1,50 +1,56 @@
 from __future__ import annotations
 
 import os
-import tempfile
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
 
 from reading_assistant.parsing import (
     BookRecord,
     BookStatus,
+    LocalBookStorage,
     ParseJobPhase,
     ParseJobRecord,
     ParseJobState,
+    ParsingRepository,
+    WhooshIndexer,
 )
+from reading_assistant.parsing.serialization import encode_page_payload
 
 from api.dependencies import (
     build_book_id,
     build_worker,
-    compute_md5_bytes,
+    build_worker_config,
+    get_engine_version,
     get_indexer,
+    get_job_queue,
     get_repo,
     get_storage,
+    new_content_hasher,
 )
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+T = TypeVar("T")
 
-def _get_repo():
-    return get_repo()
-
-
-def _get_storage():
-    return get_storage()
-
-
-def _get_indexer():
-    return get_indexer()
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Page renders never change once written for a book id.
+PAGE_IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# How long this process may serve a cached page lookup. Reparses and deletes
+# in other processes (RQ workers, other API workers) can't clear the cache,
+# so this bounds how stale it gets there. 0 turns the cache off.
+PAGE_CACHE_TTL_S = float(os.getenv("PAGE_CACHE_TTL_S", "30"))
 
 
 @router.get("")
-def list_documents():
-    repo = _get_repo()
-    books = repo.list_books()
-    parsed = [b for b in books if b.status == BookStatus.PARSED]
+def list_documents(repo: ParsingRepository = Depends(get_repo)):
+    parsed = repo.list_books_by_status(BookStatus.PARSED)
     return [
         {
             "id": b.id,
@@ -59,8 +65,7 @@ def list_documents():
 
 
 @router.get("/{book_id}")
-def get_document(book_id: str):
-    repo = _get_repo()
+def get_document(book_id: str, repo: ParsingRepository = Depends(get_repo)):
     book = repo.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail=f"Book not found: {book_id}")
@@ -74,81 +79,159 @@ def get_document(book_id: str):
     }
 
 
-@router.get("/{book_id}/pages/{page_number}/parsed")
-def get_parsed_page(book_id: str, page_number: int):
-    repo = _get_repo()
+def _page_cache_epoch() -> int:
+    """
+    Part of the page cache keys: it changes every PAGE_CACHE_TTL_S seconds,
+    so older entries stop being hit (and age out of the LRU).
+    """
+    return int(time.monotonic() // PAGE_CACHE_TTL_S)
+
+
+class _PageLookupCache:
+    """
+    Bounded LRU of page lookups keyed by (book_id, page_number) and the TTL
+    epoch. The value is loaded by the callable the route passes in, so a miss
+    uses that route's injected repository. Loader errors (404s) are not
+    stored, so pages still being ingested are looked up again on the next
+    request.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        # Sync routes run on FastAPI's threadpool.
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, load: Callable[[], T]) -> T:
+        if PAGE_CACHE_TTL_S <= 0:
+            # Caching disabled: every request reads the repository.
+            return load()
+        key = (*key, _page_cache_epoch())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = load()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_page_payloads = _PageLookupCache(maxsize=4096)
+_page_image_paths = _PageLookupCache(maxsize=8192)
+
+
+def _load_page_payload(repo: ParsingRepository, book_id: str, page_number: int) -> bytes:
+    payload = repo.get_page_parsed_json(book_id, page_number)
+    if payload is not None:
+        return payload
+
+    # Pages ingested before payloads were precomputed: build it from the rows.
     page = repo.get_page(book_id, page_number)
     if not page:
         raise HTTPException(status_code=404, detail=f"Page not found: {book_id} page {page_number}")
-    try:
-        blocks = repo.list_blocks_for_page(book_id, page_number)
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc))
-    if not blocks:
+    rows = repo.list_block_rows_for_page(book_id, page_number)
+    if not rows:
         raise HTTPException(status_code=404, detail=f"No blocks found for {book_id} page {page_number}")
-
-    return {
-        "page": page_number,
-        "width": page.width,
-        "height": page.height,
-        "blocks": [
-            {
-                "id": blk.id,
-                "block_type": blk.block_type,
-                "reading_order": blk.reading_order,
-                "text": blk.text,
-                "bbox": [blk.bbox_x, blk.bbox_y, blk.bbox_w, blk.bbox_h],
-                "section_id": blk.section_id,
-                "asset_id": blk.asset_id,
-            }
-            for blk in blocks
-        ],
-    }
+    return encode_page_payload(page_number, page.width, page.height, rows)
 
 
-@router.get("/{book_id}/pages/{page_number}/image")
-def get_page_image(book_id: str, page_number: int):
-    repo = _get_repo()
+def _load_page_image_path(repo: ParsingRepository, book_id: str, page_number: int) -> Path:
     page = repo.get_page(book_id, page_number)
     if not page:
         raise HTTPException(status_code=404, detail=f"Page not found: {book_id} page {page_number}")
     if not page.render_image_path:
         raise HTTPException(status_code=404, detail=f"No rendered image for {book_id} page {page_number}")
-    image_path = Path(page.render_image_path)
-    if not image_path.exists():
+    return Path(page.render_image_path)
+
+
+def clear_page_cache() -> None:
+    """Drop cached page lookups; call whenever this process deletes or reparses a book."""
+    _page_payloads.clear()
+    _page_image_paths.clear()
+
+
+@router.get("/{book_id}/pages/{page_number}/parsed")
+def get_parsed_page(book_id: str, page_number: int, repo: ParsingRepository = Depends(get_repo)):
+    payload = _page_payloads.get(
+        (book_id, page_number), lambda: _load_page_payload(repo, book_id, page_number)
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.api_route("/{book_id}/pages/{page_number}/image", methods=["GET", "HEAD"])
+def get_page_image(
+    book_id: str,
+    page_number: int,
+    repo: ParsingRepository = Depends(get_repo),
+    storage: LocalBookStorage = Depends(get_storage),
+):
+    image_path = _page_image_paths.get(
+        (book_id, page_number), lambda: _load_page_image_path(repo, book_id, page_number)
+    )
+    headers = {"Cache-Control": PAGE_IMAGE_CACHE_CONTROL}
+    accel_uri = _xaccel_uri(image_path, storage)
+    if accel_uri is not None:
+        # nginx serves the bytes itself (sendfile) from its `internal` location.
+        headers["X-Accel-Redirect"] = accel_uri
+        return Response(status_code=200, media_type="image/png", headers=headers)
+    # One stat per request: FileResponse reuses it instead of stat-ing again.
+    try:
+        stat_result = os.stat(image_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Image file missing on disk for {book_id} page {page_number}")
-    return FileResponse(image_path, media_type="image/png")
+    return FileResponse(image_path, media_type="image/png", headers=headers, stat_result=stat_result)
+
+
+def _xaccel_uri(path: Path, storage: LocalBookStorage) -> Optional[str]:
+    """
+    Map a stored file to nginx's internal location when USE_XACCEL is set.
+    Returns None (serve from Python) when disabled or the file lives outside
+    the storage root.
+    """
+    if os.getenv("USE_XACCEL", "").lower() not in ("1", "true", "yes"):
+        return None
+    prefix = os.getenv("XACCEL_PREFIX", "/_internal").rstrip("/")
+    try:
+        relative = path.resolve().relative_to(storage.paths.root.resolve())
+    except ValueError:
+        return None
+    return f"{prefix}/{relative.as_posix()}"
 
 
 @router.get("/{book_id}/search")
-def search_document(book_id: str, query: str, limit: int = 20):
+def search_document(
+    book_id: str,
+    query: str,
+    limit: int = 20,
+    repo: ParsingRepository = Depends(get_repo),
+    indexer: WhooshIndexer = Depends(get_indexer),
+):
     if not query or not query.strip():
         raise HTTPException(status_code=400, detail="Query must not be empty")
-    repo = _get_repo()
     book = repo.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail=f"Book not found: {book_id}")
 
-    results = _get_indexer().search(f"{query}", limit=limit)
-    hits = []
-    for hit in results:
-        page_id = hit.get("page_id") or ""
-        page_number = 0
-        if "-p" in page_id:
-            try:
-                page_number = int(page_id.split("-p")[-1])
-            except Exception:
-                page_number = 0
-        hits.append(
-            {
-                "block_id": hit.get("block_id"),
-                "page_id": page_id,
-                "page_number": page_number,
-                "reading_order": int(hit.get("reading_order") or 0),
-                "text": hit.get("text") or "",
-            }
-        )
-    return {"hits": hits}
+    results = indexer.search(f"{query}", limit=limit)
+    return {"hits": [_format_hit(hit) for hit in results]}
+
+
+def _format_hit(hit: dict) -> dict:
+    return {
+        "block_id": hit.get("block_id"),
+        "page_id": hit.get("page_id") or "",
+        "page_number": int(hit.get("page_number") or 0),
+        "reading_order": int(hit.get("reading_order") or 0),
+        "text": hit.get("text") or "",
+    }
 
 
 @router.post("/upload")
@@ -159,42 +242,45 @@ async def upload_document(
     author: Optional[str] = Form(None),
     language: str = Form("en"),
     perform_ocr: bool = Form(False),
+    repo: ParsingRepository = Depends(get_repo),
+    storage: LocalBookStorage = Depends(get_storage),
 ):
     if file.content_type not in ("application/pdf", "application/octet-stream"):
         raise HTTPException(status_code=400, detail="Only PDF uploads are supported")
-    payload = await file.read()
-    if not payload:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
-    repo = _get_repo()
-    storage = _get_storage()
+    # Repository calls are blocking; keep them off the event loop so uploads
+    # don't stall the sync handlers FastAPI is serving from its threadpool.
     book_id = build_book_id(title)
-    if repo.get_book(book_id):
+    if await run_in_threadpool(repo.get_book, book_id):
         raise HTTPException(status_code=409, detail=f"Book already exists: {book_id}")
 
-    tmp_fd, tmp_path_str = tempfile.mkstemp(suffix=".pdf")
-    tmp_path = Path(tmp_path_str)
-    with os.fdopen(tmp_fd, "wb") as tmp_file:
-        tmp_file.write(payload)
-
-    storage.ensure_base_dirs(book_id)
-    original_pdf_path = storage.save_original_pdf(book_id, tmp_path)
-    tmp_path.unlink(missing_ok=True)
+    # Hash while streaming straight into storage; the PDF is never held in memory.
+    # On any failure (including a client disconnect) open_original_pdf removes
+    # only this request's partial file, never an existing book's files.
+    hasher = new_content_hasher()
+    size = 0
+    with storage.open_original_pdf(book_id) as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    original_pdf_path = storage.paths.original_pdf_path(book_id)
 
-    engine = build_worker(perform_ocr).engine
     book = BookRecord(
         id=book_id,
         user_id="upload-user",
-        file_md5=compute_md5_bytes(payload),
+        file_md5=hasher.hexdigest(),
         title=title,
         author=author,
         source="upload",
         original_file_path=str(original_pdf_path),
         language=language,
-        parse_version=engine.engine_version,
+        parse_version=get_engine_version(),
         status=BookStatus.UPLOADED,
     )
-    repo.save_book(book)
+    await run_in_threadpool(repo.save_book, book)
 
     job_id = f"job-{book_id}"
     job = ParseJobRecord(
@@ -204,12 +290,20 @@ async def upload_document(
         phase=ParseJobPhase.PRECHECK,
         current_page=0,
     )
-    repo.save_job(job)
+    await run_in_threadpool(repo.save_job, job)
 
-    background_tasks.add_task(_run_job, job_id, perform_ocr)
+    queue = get_job_queue()
+    if queue is not None:
+        await run_in_threadpool(queue.enqueue_parse_job, job_id, build_worker_config(perform_ocr))
+    else:
+        background_tasks.add_task(_run_job, job_id, perform_ocr)
     return {"book_id": book_id, "job_id": job_id}
 
 
 def _run_job(job_id: str, perform_ocr: bool) -> None:
     worker = build_worker(perform_ocr)
-    worker.run_job(job_id)
+    try:
+        worker.run_job(job_id)
+    finally:
+        # The pages were (re)written in this process, so don't wait for the TTL.
+        clear_page_cache()
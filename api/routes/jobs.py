@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-
-from reading_assistant.parsing import BookStatus, ParseJobState
-from api.dependencies import get_storage, get_indexer
-
-from api.dependencies import get_repo
+from fastapi import APIRouter, Depends, HTTPException
+
+from reading_assistant.parsing import (
+    BookStatus,
+    LocalBookStorage,
+    ParseJobState,
+    ParsingRepository,
+    WhooshIndexer,
+)
+from api.dependencies import get_indexer, get_repo, get_storage
+from api.routes.documents import clear_page_cache
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
 @router.get("/{job_id}")
-def get_job(job_id: str):
-    repo = get_repo()
+def get_job(job_id: str, repo: ParsingRepository = Depends(get_repo)):
     job = repo.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
@@ -28,8 +32,12 @@ def get_job(job_id: str):
 
 
 @router.post("/{job_id}/cancel")
-def cancel_job(job_id: str):
-    repo = get_repo()
+def cancel_job(
+    job_id: str,
+    repo: ParsingRepository = Depends(get_repo),
+    storage: LocalBookStorage = Depends(get_storage),
+    indexer: WhooshIndexer = Depends(get_indexer),
+):
     job = repo.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
@@ -40,7 +48,8 @@ def cancel_job(job_id: str):
     repo.update_job_state_phase(job_id, state=ParseJobState.FAILED, error_message="Cancelled by user")
     repo.update_book_status(book.id, BookStatus.FAILED)
     # Clean up storage, index, and DB records.
-    get_storage().delete_book(book.id)
-    get_indexer().delete_book(book.id)
+    storage.delete_book(book.id)
+    indexer.delete_book(book.id)
     repo.delete_book(book.id)
+    clear_page_cache()
     return {"status": "cancelled", "job_id": job_id, "book_id": book.id}
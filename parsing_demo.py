@@ -11,6 +11,8 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+from blake3 import blake3
+
 from reading_assistant.parsing import (
     BookRecord,
     BookStatus,
@@ -26,11 +28,10 @@ from reading_assistant.parsing import (
 )
 
 
-def compute_md5(path: Path) -> str:
-    digest = hashlib.md5()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            digest.update(chunk)
+def compute_content_hash(path: Path) -> str:
+    """BLAKE3 digest of the file, matching what the upload API stores in `file_md5`."""
+    digest = blake3(max_threads=blake3.AUTO)
+    digest.update_mmap(path)
     return digest.hexdigest()
 
 
@@ -89,7 +90,7 @@ def main():
     book = BookRecord(
         id=book_id,
         user_id="local-user",
-        file_md5=compute_md5(args.pdf),
+        file_md5=compute_content_hash(args.pdf),
         title=args.title,
         author=args.author,
         source="upload",
@@ -0,0 +1,51 @@
+"""
+Write INT8 (dynamically quantized) copies of the RapidOCR ONNX models.
+
+Usage:
+    python3 quantize_ocr_models.py --det ch_PP-OCRv4_det_infer.onnx \
+        --rec ch_PP-OCRv4_rec_infer.onnx --cls ch_ppocr_mobile_v2.0_cls_infer.onnx \
+        --out ./data/ocr-int8
+
+Point the parser at the results with OCR_DET_MODEL_PATH / OCR_REC_MODEL_PATH /
+OCR_CLS_MODEL_PATH. The stock FP32 models are the ones Docling downloads into
+its artifacts directory. INT8 roughly doubles CPU throughput on VNNI-capable
+CPUs and halves model memory, at a small accuracy cost; check a few pages.
+"""
+
+import argparse
+from pathlib import Path
+
+
+def quantize(model_in: Path, out_dir: Path) -> Path:
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as exc:  # pragma: no cover - dependency guard
+        raise RuntimeError("onnxruntime is required for quantization. Please install 'onnxruntime'.") from exc
+
+    model_out = out_dir / f"{model_in.stem}.int8.onnx"
+    quantize_dynamic(str(model_in), str(model_out), weight_type=QuantType.QInt8)
+    return model_out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--det", type=Path, help="RapidOCR text detection model (FP32 ONNX)")
+    parser.add_argument("--rec", type=Path, help="RapidOCR text recognition model (FP32 ONNX)")
+    parser.add_argument("--cls", type=Path, help="RapidOCR text direction classifier (FP32 ONNX)")
+    parser.add_argument("--out", type=Path, default=Path("./data/ocr-int8"), help="Output directory")
+    args = parser.parse_args()
+
+    models = {"DET": args.det, "REC": args.rec, "CLS": args.cls}
+    if not any(models.values()):
+        parser.error("pass at least one of --det, --rec, --cls")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for kind, model_in in models.items():
+        if model_in is None:
+            continue
+        model_out = quantize(model_in, args.out)
+        print(f"OCR_{kind}_MODEL_PATH={model_out}")
+
+
+if __name__ == "__main__":
+    main()
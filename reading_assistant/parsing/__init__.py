@@ -2,11 +2,12 @@
 Parsing subsystem exports.
 """
 
-from .engine import ParsingEngine, DoclingParsingEngine
+from .engine import ParsingEngine, DoclingParsingEngine, DummyParsingEngine
 from .indexing import Indexer, NoopIndexer, WhooshIndexer
 from .job_queue import RQJobQueue, WorkerConfig, run_parse_job
 from .models import (
     AssetRecord,
+    BlockBatch,
     BlockRecord,
     BookRecord,
     BookStatus,
@@ -16,19 +17,28 @@ from .models import (
     ParseJobState,
     SectionRecord,
 )
-from .repository import InMemoryParsingRepository, ParsingRepository, SqlAlchemyParsingRepository
+from .parse_cache import LocalParseCache, ParseCache
+from .repository import (
+    InMemoryParsingRepository,
+    ParsingRepository,
+    SqlAlchemyParsingRepository,
+    create_database_engine,
+)
 from .storage import LocalBookStorage, StoragePaths
 from .worker import ParsingWorker
 
 __all__ = [
     "AssetRecord",
+    "BlockBatch",
     "BlockRecord",
     "BookRecord",
     "BookStatus",
     "DoclingParsingEngine",
+    "DummyParsingEngine",
     "Indexer",
     "InMemoryParsingRepository",
     "LocalBookStorage",
+    "LocalParseCache",
     "NoopIndexer",
     "WhooshIndexer",
     "RQJobQueue",
@@ -36,6 +46,7 @@ __all__ = [
     "ParseJobPhase",
     "ParseJobRecord",
     "ParseJobState",
+    "ParseCache",
     "ParsingEngine",
     "ParsingRepository",
     "SqlAlchemyParsingRepository",
@@ -45,4 +56,5 @@ __all__ = [
     "SectionRecord",
     "StoragePaths",
     "ParsingRepository",
+    "create_database_engine",
 ]
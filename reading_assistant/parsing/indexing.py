@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import Iterable, Protocol
+import queue
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable, List, Literal, Mapping, Optional, Protocol, Sequence, Tuple, Union
 from pathlib import Path
 
 from whoosh import index
@@ -9,9 +14,38 @@ from whoosh.qparser import QueryParser
 
 from .models import BlockRecord
 
+_PAGE_ID_RE = re.compile(r"-p(\d+)$")
+
+IndexMode = Literal["full", "incremental"]
+
+# Queue operations of the background writer that change the index.
+_WRITE_OPS = ("delete", "add", "update")
+
+
+def _page_number_from_id(page_id: Optional[str]) -> int:
+    # Page ids are built as f"{book_id}-p{page_number}" by the worker.
+    match = _PAGE_ID_RE.search(page_id or "")
+    return int(match.group(1)) if match else 0
+
+
+def _block_document(book_id: str, block: BlockRecord) -> dict:
+    return {
+        "book_id": book_id,
+        "block_id": block.id,
+        "page_id": block.page_id,
+        "page_number": _page_number_from_id(block.page_id),
+        "reading_order": block.reading_order,
+        "text": block.text or "",
+    }
+
 
 class Indexer(Protocol):
-    def index_book(self, book_id: str, blocks: Iterable[BlockRecord]) -> None:
+    def index_book(self, book_id: str, blocks: Iterable[BlockRecord], parallel: bool = False) -> None:
+        """`parallel` hints a large first-time load; writers may defer work such as segment merges."""
+        ...
+
+    def flush(self) -> None:
+        """Block until everything passed to index_book is committed."""
         ...
 
 
@@ -20,7 +54,10 @@ class NoopIndexer:
     Default indexer stub. Keeps the pipeline wired without pulling in Whoosh.
     """
 
-    def index_book(self, book_id: str, blocks: Iterable[BlockRecord]) -> None:
+    def index_book(self, book_id: str, blocks: Iterable[BlockRecord], parallel: bool = False) -> None:
+        return None
+
+    def flush(self) -> None:
         return None
 
 
@@ -28,59 +65,239 @@ class WhooshIndexer:
     """
     File-system backed Whoosh indexer. Creates an index if not present and
     re-indexes all blocks for a given book by first deleting existing docs.
+
+    `limitmb` applies to every writer. `procs` and `multisegment` only apply
+    to a book's first full load (`parallel=True`): with `multisegment=True`
+    each sub-process writes its own segment and that commit skips merging.
+    Every other commit (reparses, incremental updates, the background writer)
+    merges as usual, so segments and deleted documents do not pile up.
+    `index_books_bulk` writes many books through one writer and one commit,
+    so a re-index pays the segment flush and fsync once instead of per book.
+    The writer is not kept open between calls: it holds the index lock, which
+    the API (delete_book) and other workers need.
+
+    After `start_writer_thread()`, index_book only enqueues documents on a
+    bounded queue (backpressure for the producer) and a background thread
+    writes them. It commits whenever the queue runs dry, so its writer (and
+    the index lock) is never held while idle, and otherwise every
+    `batch_size` documents or `commit_interval_s` seconds. `flush()` waits
+    for everything queued to be committed.
+
+    `mode="incremental"` skips the per-book delete and replaces documents by
+    their unique block_id (Whoosh update_document), touching only the given
+    blocks. It is only correct when block ids are stable across parses and
+    no block was removed; documents for dropped blocks are left behind.
+
+    Searches reuse one query parser (with an LRU of parsed query strings) and
+    one long-lived searcher; the searcher is refreshed only when a newer index
+    generation has been committed (by this process or a worker), so unchanged
+    segments are not reopened.
     """
 
-    def __init__(self, index_dir: Path):
+    def __init__(self, index_dir: Path, limitmb: int = 128, procs: int = 1, multisegment: bool = False):
         self.index_dir = index_dir
+        self.limitmb = limitmb
+        self.procs = procs
+        self.multisegment = multisegment
         self.index_dir.mkdir(parents=True, exist_ok=True)
         self.schema = Schema(
             book_id=ID(stored=True),
             block_id=ID(stored=True, unique=True),
             page_id=ID(stored=True),
+            page_number=NUMERIC(stored=True),
             reading_order=NUMERIC(stored=True, sortable=True),
             text=TEXT(stored=True),
         )
         if index.exists_in(self.index_dir):
             self.ix = index.open_dir(self.index_dir)
+            if "page_number" not in self.ix.schema:
+                # Indexes created before page_number was stored: add the field in place.
+                writer = self.ix.writer()
+                writer.add_field("page_number", NUMERIC(stored=True))
+                writer.commit()
         else:
             self.ix = index.create_in(self.index_dir, self.schema)
+        self._parser = QueryParser("text", schema=self.ix.schema)
+        # Parsed queries are immutable, so repeated query strings reuse them.
+        self._parse_query = lru_cache(maxsize=1024)(self._parser.parse)
+        self._searcher = None
+        # Whoosh searchers are not safe to share between threads.
+        self._search_lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_error: Optional[BaseException] = None
 
-    def index_book(self, book_id: str, blocks: Iterable[BlockRecord]) -> None:
-        # Remove old entries for the book to keep indexing idempotent.
-        writer = self.ix.writer()
-        writer.delete_by_term("book_id", book_id)
+    def index_book(
+        self, book_id: str, blocks: Iterable[BlockRecord], mode: IndexMode = "full", parallel: bool = False
+    ) -> None:
+        if self._queue is None:
+            self.index_books_bulk({book_id: blocks}, mode=mode, parallel=parallel)
+            return
+        self._raise_writer_error()
+        if mode == "incremental":
+            for block in blocks:
+                self._queue.put(("update", _block_document(book_id, block)))
+            return
+        # Queued in order, so the delete is applied before the new documents.
+        self._queue.put(("delete", book_id))
         for block in blocks:
-            writer.add_document(
-                book_id=book_id,
-                block_id=block.id,
-                page_id=block.page_id,
-                reading_order=block.reading_order,
-                text=block.text or "",
-            )
-        writer.commit()
+            self._queue.put(("add", _block_document(book_id, block)))
+
+    def index_books_bulk(
+        self, book_blocks: Mapping[str, Iterable[BlockRecord]], mode: IndexMode = "full", parallel: bool = False
+    ) -> None:
+        if parallel and mode == "full":
+            # A book's first load: the configured multi-process writer, which
+            # skips the merge on commit only when it writes multiple segments.
+            writer = self.ix.writer(limitmb=self.limitmb, procs=self.procs, multisegment=self.multisegment)
+            merge = not self.multisegment
+        else:
+            writer = self._open_writer()
+            merge = True
+        for book_id, blocks in book_blocks.items():
+            if mode == "incremental":
+                for block in blocks:
+                    writer.update_document(**_block_document(book_id, block))
+                continue
+            # Remove old entries for the book to keep indexing idempotent.
+            writer.delete_by_term("book_id", book_id)
+            for block in blocks:
+                writer.add_document(**_block_document(book_id, block))
+        writer.commit(merge=merge)
+
+    def start_writer_thread(self, batch_size: int = 1000, commit_interval_s: float = 2.0, maxsize: int = 10_000) -> None:
+        if self._writer_thread is not None:
+            return
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._writer_thread = threading.Thread(
+            target=self._drain, args=(batch_size, commit_interval_s), name="whoosh-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.put(("flush", None))
+            self._queue.join()
+        self._raise_writer_error()
+
+    def close(self) -> None:
+        """Commit anything queued and stop the writer thread."""
+        if self._writer_thread is None:
+            return
+        self._queue.put(("stop", None))
+        self._queue.join()
+        self._writer_thread.join()
+        self._queue = None
+        self._writer_thread = None
+        self._raise_writer_error()
+
+    def _open_writer(self):
+        return self.ix.writer(limitmb=self.limitmb)
+
+    def _drain(self, batch_size: int, commit_interval_s: float) -> None:
+        # The writer is only touched from this thread. It is committed before
+        # the thread blocks on an empty queue, so the index lock is released
+        # for other writers (the API's delete_book, other workers).
+        writer = None
+        pending = 0
+        deadline = None
+        while True:
+            op, payload = self._queue.get()
+            try:
+                if op in _WRITE_OPS and self._writer_error is None:
+                    if writer is None:
+                        writer = self._open_writer()
+                        deadline = time.monotonic() + commit_interval_s
+                    if op == "delete":
+                        writer.delete_by_term("book_id", payload)
+                    elif op == "update":
+                        writer.update_document(**payload)
+                    else:
+                        writer.add_document(**payload)
+                    pending += 1
+                # "flush" and "stop" commit too.
+                if writer is not None and (
+                    op not in _WRITE_OPS
+                    or pending >= batch_size
+                    or time.monotonic() >= deadline
+                    or self._queue.empty()
+                ):
+                    writer.commit()
+                    writer, pending, deadline = None, 0, None
+            except Exception as exc:  # noqa: BLE001 - surfaced on the next call
+                self._writer_error = exc
+                if writer is not None:
+                    writer.cancel()
+                writer, pending, deadline = None, 0, None
+            finally:
+                self._queue.task_done()
+            if op == "stop":
+                return
+
+    def _raise_writer_error(self) -> None:
+        if self._writer_error is not None:
+            exc, self._writer_error = self._writer_error, None
+            raise RuntimeError("background indexing failed") from exc
+
+    def optimize(self) -> None:
+        """Merge all segments into one; for a maintenance job, not the request path."""
+        self.ix.optimize()
 
     def delete_book(self, book_id: str) -> None:
+        # Deletes only mark documents; leave segment merging to the next
+        # indexing commit instead of rewriting segments on the request path.
         writer = self.ix.writer()
         writer.delete_by_term("book_id", book_id)
-        writer.commit()
+        writer.commit(merge=False)
 
-    def search(self, query_str: str, limit: int = 10):
+    def search(
+        self, query_str: str, limit: int = 10, fields: Optional[Sequence[str]] = None
+    ) -> Union[List[dict], List[Tuple]]:
         """
         Return a list of plain dicts so callers are safe after the searcher closes.
+
+        With `fields` (e.g. ("block_id", "reading_order") for a follow-up SQL
+        fetch), each hit is a tuple of just those stored values in that order,
+        skipping the per-hit dict and the copy of the block text.
         """
-        qp = QueryParser("text", schema=self.schema)
-        q = qp.parse(query_str)
-        with self.ix.searcher() as searcher:
+        q = self._parse_query(query_str)
+        with self._search_lock:
+            searcher = self._current_searcher()
             results = searcher.search(q, limit=limit)
+            if fields is not None:
+                return [self._project_hit(hit.fields(), fields) for hit in results]
             hits = []
             for hit in results:
-                fields = hit.fields()
+                stored = hit.fields()
                 hits.append(
                     {
-                        "block_id": fields.get("block_id"),
-                        "page_id": fields.get("page_id"),
-                        "reading_order": fields.get("reading_order"),
-                        "text": fields.get("text"),
+                        "block_id": stored.get("block_id"),
+                        "page_id": stored.get("page_id"),
+                        "page_number": self._hit_page_number(stored),
+                        "reading_order": stored.get("reading_order"),
+                        "text": stored.get("text"),
                     }
                 )
             return hits
+
+    @staticmethod
+    def _hit_page_number(stored: dict) -> int:
+        page_number = stored.get("page_number")
+        if page_number is None:
+            page_number = _page_number_from_id(stored.get("page_id"))
+        return page_number
+
+    @staticmethod
+    def _project_hit(stored: dict, fields: Sequence[str]) -> Tuple:
+        return tuple(
+            WhooshIndexer._hit_page_number(stored) if name == "page_number" else stored.get(name) for name in fields
+        )
+
+    def _current_searcher(self):
+        # refresh() is a cheap generation check that returns the same searcher
+        # when nothing was committed; otherwise it reuses unchanged segments.
+        if self._searcher is None:
+            self._searcher = self.ix.searcher()
+        else:
+            self._searcher = self._searcher.refresh()
+        return self._searcher
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, Optional, Tuple, Type
 
-from redis import Redis
-from rq import Queue, Worker
+from redis import ConnectionPool, Redis
+from rq import Queue, SimpleWorker, Worker
+from sqlalchemy.engine import Engine
 
 from .engine import DoclingParsingEngine
 from .indexing import WhooshIndexer
-from .repository import SqlAlchemyParsingRepository
+from .parse_cache import LocalParseCache
+from .repository import SqlAlchemyParsingRepository, create_database_engine
 from .storage import LocalBookStorage, StoragePaths
 from .worker import ParsingWorker
 
 
+# Per-job limit for queued parses: long OCR runs of big books take hours.
+DEFAULT_JOB_TIMEOUT_S = 6 * 60 * 60
+
+
 @dataclass
 class WorkerConfig:
     database_url: str
@@ -20,19 +28,60 @@ class WorkerConfig:
     whoosh_index_dir: str
     perform_ocr: bool = True
     engine_version: str = "docling-latest"
+    page_workers: int = 1
+    render_workers: int = 1
+    pdf_backend: str = "pypdfium"
+    generate_asset_images: bool = False
+    parse_cache_dir: Optional[str] = None
+    device: str = "auto"
+    ocr_det_model_path: Optional[str] = None
+    ocr_rec_model_path: Optional[str] = None
+    ocr_cls_model_path: Optional[str] = None
     batch_size: int = 50
     persist_engine_output: bool = False
     render_page_previews: bool = True
+    whoosh_limitmb: int = 128
+    whoosh_procs: int = 1
+    whoosh_multisegment: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+
+
+@lru_cache(maxsize=None)
+def _shared_engine(database_url: str, pool_size: int, max_overflow: int) -> Engine:
+    """
+    One engine per database settings per worker process, built like the
+    API's. RQJobQueue.work runs jobs in-process (SimpleWorker), so consecutive
+    jobs of a worker reuse its pooled connections.
+    """
+    return create_database_engine(database_url, pool_size=pool_size, max_overflow=max_overflow)
 
 
 def run_parse_job(job_id: str, config: WorkerConfig) -> None:
     """
     RQ task entrypoint. Creates all required components and executes a parse job.
     """
-    repo = SqlAlchemyParsingRepository(config.database_url)
-    storage = LocalBookStorage(StoragePaths(Path(config.book_storage_root)))
-    engine = DoclingParsingEngine(perform_ocr=config.perform_ocr, engine_version=config.engine_version)
-    indexer = WhooshIndexer(Path(config.whoosh_index_dir))
+    db_engine = _shared_engine(config.database_url, config.db_pool_size, config.db_max_overflow)
+    repo = SqlAlchemyParsingRepository(engine=db_engine)
+    storage = LocalBookStorage(StoragePaths(Path(config.book_storage_root)), render_workers=config.render_workers)
+    engine = DoclingParsingEngine(
+        perform_ocr=config.perform_ocr,
+        engine_version=config.engine_version,
+        page_workers=config.page_workers,
+        backend=config.pdf_backend,
+        generate_images=config.generate_asset_images,
+        device=config.device,
+        ocr_det_model_path=config.ocr_det_model_path,
+        ocr_rec_model_path=config.ocr_rec_model_path,
+        ocr_cls_model_path=config.ocr_cls_model_path,
+        cache=LocalParseCache(Path(config.parse_cache_dir)) if config.parse_cache_dir else None,
+    )
+    indexer = WhooshIndexer(
+        Path(config.whoosh_index_dir),
+        limitmb=config.whoosh_limitmb,
+        procs=config.whoosh_procs,
+        multisegment=config.whoosh_multisegment,
+    )
     worker = ParsingWorker(
         repository=repo,
         storage=storage,
@@ -49,18 +98,68 @@ class RQJobQueue:
     """
     Redis-backed job queue using RQ. The queue pushes jobs to Redis and workers
     can be started by calling `work()` in a dedicated process.
+
+    Connections come from a bounded pool (`self.pool`) so concurrent enqueues
+    from API threads use separate sockets; pass it to other RQJobQueue or
+    Queue instances to share it. Idle sockets are health-checked before reuse.
+
+    `job_timeout` (seconds, -1 for none) caps each parse job; RQ's own default
+    of 180 s would kill most OCR parses.
     """
 
-    def __init__(self, redis_url: str = "redis://localhost:6379/0", queue_name: str = "parse-jobs"):
-        self.redis = Redis.from_url(redis_url)
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        queue_name: str = "parse-jobs",
+        max_connections: int = 32,
+        pool: Optional[ConnectionPool] = None,
+        job_timeout: int = DEFAULT_JOB_TIMEOUT_S,
+    ):
+        self.job_timeout = job_timeout
+        self.pool = pool or ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            socket_timeout=5,
+            socket_keepalive=True,
+            health_check_interval=30,
+        )
+        self.redis = Redis(connection_pool=self.pool)
         self.queue = Queue(queue_name, connection=self.redis)
 
     def enqueue_parse_job(self, job_id: str, config: WorkerConfig):
         """
         Enqueue a parsing job. RQ job_id is set to parse job id for idempotency.
         """
-        return self.queue.enqueue(run_parse_job, job_id, config, job_id=job_id, retry=None)
+        return self.queue.enqueue(
+            run_parse_job, job_id, config, job_id=job_id, retry=None, job_timeout=self.job_timeout
+        )
 
-    def work(self):
-        worker = Worker([self.queue], connection=self.redis)
+    def enqueue_many(self, jobs: Iterable[Tuple[str, WorkerConfig]]):
+        """
+        Enqueue several parsing jobs in one Redis round-trip: RQ writes every
+        job hash and the queue push through a single non-transactional pipeline.
+        """
+        job_datas = [
+            Queue.prepare_data(
+                run_parse_job, args=(job_id, config), job_id=job_id, retry=None, timeout=self.job_timeout
+            )
+            for job_id, config in jobs
+        ]
+        if not job_datas:
+            return []
+        with self.redis.pipeline(transaction=False) as pipe:
+            enqueued = self.queue.enqueue_many(job_datas, pipeline=pipe)
+            pipe.execute()
+        return enqueued
+
+    def work(self, worker_class: Type[Worker] = SimpleWorker):
+        """
+        Consume jobs in this process. The default SimpleWorker runs each job
+        in-process, so the converters and the database engine loaded by the
+        first job stay warm for the next; rq's forking Worker would reload the
+        models in a fresh work horse for every job. The trade-off is that a
+        crash inside a job (e.g. a native segfault) takes the worker down, so
+        run it under a supervisor; pass `Worker` to isolate jobs instead.
+        """
+        worker = worker_class([self.queue], connection=self.redis)
         worker.work(with_scheduler=True)
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 class BookStatus(str, Enum):
     UPLOADED = "uploaded"
@@ -30,7 +32,10 @@ class ParseJobPhase(str, Enum):
     INDEXING = "indexing"
 
 
-@dataclass
+# Parsed* and *Record objects are allocated per block/asset of every book, so
+# they use __slots__ (no per-instance __dict__). BBox is frozen and therefore
+# hashable.
+@dataclass(slots=True, frozen=True)
 class BBox:
     x: float
     y: float
@@ -38,14 +43,14 @@ class BBox:
     h: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedPage:
     page_number: int
     width: float
     height: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedSection:
     id: str
     parent_id: Optional[str]
@@ -56,7 +61,7 @@ class ParsedSection:
     order_index: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedBlock:
     id: str
     page_number: int
@@ -71,7 +76,7 @@ class ParsedBlock:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedAsset:
     id: str
     page_number: int
@@ -82,7 +87,7 @@ class ParsedAsset:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedBook:
     pages: List[ParsedPage]
     sections: List[ParsedSection]
@@ -92,7 +97,7 @@ class ParsedBook:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class BookRecord:
     id: str
     user_id: str
@@ -109,7 +114,7 @@ class BookRecord:
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseJobRecord:
     id: str
     book_id: str
@@ -123,7 +128,7 @@ class ParseJobRecord:
     config_json: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class PageRecord:
     id: str
     book_id: str
@@ -133,11 +138,13 @@ class PageRecord:
     render_image_path: Optional[str]
     thumbnail_image_path: Optional[str]
     parse_status: str
+    # Pre-encoded `/pages/{n}/parsed` body, written once at ingestion.
+    parsed_json: Optional[bytes] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class SectionRecord:
     id: str
     book_id: str
@@ -151,7 +158,7 @@ class SectionRecord:
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class BlockRecord:
     id: str
     book_id: str
@@ -171,7 +178,7 @@ class BlockRecord:
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class AssetRecord:
     id: str
     book_id: str
@@ -186,3 +193,42 @@ class AssetRecord:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
+
+@dataclass(slots=True)
+class BlockBatch:
+    """
+    Column-oriented view of many blocks for bulk work: bboxes as one (N, 4)
+    float32 array (x, y, w, h) and reading order as int32, so sorting and
+    geometry run vectorised instead of per BlockRecord.
+    """
+
+    ids: np.ndarray  # object
+    page_ids: np.ndarray  # object
+    reading_order: np.ndarray  # int32
+    bbox: np.ndarray  # float32, shape (N, 4)
+    text: List[Optional[str]]
+
+    # Row layout accepted by from_rows.
+    ROW_FIELDS = ("id", "page_id", "reading_order", "text", "bbox_x", "bbox_y", "bbox_w", "bbox_h")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> "BlockBatch":
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(cls.ROW_FIELDS)
+        # Missing values become NaN (bbox) or 0 (reading order).
+        reading_order = np.nan_to_num(np.asarray(columns[2], dtype=np.float64)).astype(np.int32)
+        bbox = np.asarray(columns[4:8], dtype=np.float32).reshape(4, len(rows)).T
+        return cls(
+            ids=np.asarray(columns[0], dtype=object),
+            page_ids=np.asarray(columns[1], dtype=object),
+            reading_order=reading_order,
+            bbox=np.ascontiguousarray(bbox),
+            text=list(columns[3]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def reading_order_index(self) -> np.ndarray:
+        """Indices that put the batch in reading order (stable)."""
+        return np.argsort(self.reading_order, kind="stable")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional, Protocol, Union
+
+from blake3 import blake3
+
+from .models import ParsedBook
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache(Protocol):
+    def get(self, key: str) -> Optional[ParsedBook]:
+        ...
+
+    def put(self, key: str, book: ParsedBook) -> None:
+        ...
+
+
+class LocalParseCache:
+    """
+    Stores parsed books as pickles under `cache_dir`, one file per key, so
+    re-parsing an unchanged PDF with the same settings is a file read.
+    Unreadable entries are treated as misses and failed writes are skipped.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[ParsedBook]:
+        try:
+            with self._path(key).open("rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: BLE001
+            logger.warning("Ignoring unreadable parse cache entry %s", key, exc_info=True)
+            return None
+
+    def put(self, key: str, book: ParsedBook) -> None:
+        # A partial file unique to this writer: concurrent puts of the same key
+        # (two workers parsing one PDF) each replace the target atomically.
+        # Failures are logged, not raised: the parse itself succeeded.
+        partial: Optional[str] = None
+        try:
+            fd, partial = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".part")
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(book, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(partial, self._path(key))
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not write parse cache entry %s", key, exc_info=True)
+            if partial is not None:
+                Path(partial).unlink(missing_ok=True)
+
+
+def parse_cache_key(pdf: Union[Path, bytes], engine_version: str, options: object) -> str:
+    """
+    Key for one parse: BLAKE3 of the PDF bytes (a file, mapped, or the bytes
+    themselves), the engine version and the repr of the settings that affect
+    the output.
+    """
+    content = blake3(max_threads=blake3.AUTO)
+    if isinstance(pdf, bytes):
+        content.update(pdf)
+    else:
+        content.update_mmap(str(pdf))
+    settings = blake3(f"{engine_version}|{options!r}".encode("utf-8")).hexdigest()
+    return f"{content.hexdigest()}-{settings[:16]}"
@@ -0,0 +1,46 @@
+"""
+Wire formats shared by the ingestion worker and the API.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+import orjson
+
+
+def encode_page_payload(page_number: int, width: float, height: float, block_rows: Iterable[Tuple]) -> bytes:
+    """
+    Encode the `/pages/{n}/parsed` response body. `block_rows` are tuples in
+    `repository.BLOCK_ROW_FIELDS` order, already sorted by reading order.
+    """
+    return orjson.dumps(
+        {
+            "page": page_number,
+            "width": width,
+            "height": height,
+            "blocks": [
+                {
+                    "id": block_id,
+                    "block_type": block_type,
+                    "reading_order": int(reading_order or 0),
+                    "text": text,
+                    "bbox": [bbox_x, bbox_y, bbox_w, bbox_h],
+                    "section_id": section_id,
+                    "asset_id": asset_id,
+                }
+                for (
+                    block_id,
+                    block_type,
+                    reading_order,
+                    text,
+                    bbox_x,
+                    bbox_y,
+                    bbox_w,
+                    bbox_h,
+                    section_id,
+                    asset_id,
+                ) in block_rows
+            ],
+        }
+    )
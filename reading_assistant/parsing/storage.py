@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-import json
 import logging
+import multiprocessing
+import os
 import shutil
-from dataclasses import dataclass
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +20,25 @@ logger = logging.getLogger(__name__)
 @dataclass
 class StoragePaths:
     root: Path
+    # book_id -> (book dir, pages dir, assets dir). The layout is fixed per
+    # root, so the joins are done once per book rather than on every path.
+    _dirs: Dict[str, Tuple[Path, Path, Path]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def _book_dirs(self, book_id: str) -> Tuple[Path, Path, Path]:
+        dirs = self._dirs.get(book_id)
+        if dirs is None:
+            base = self.root / "books" / str(book_id)
+            dirs = self._dirs[book_id] = (base, base / "pages", base / "assets")
+        return dirs
 
     def book_dir(self, book_id: str) -> Path:
-        return self.root / "books" / str(book_id)
+        return self._book_dirs(book_id)[0]
+
+    def pages_dir(self, book_id: str) -> Path:
+        return self._book_dirs(book_id)[1]
+
+    def assets_dir(self, book_id: str) -> Path:
+        return self._book_dirs(book_id)[2]
 
     def original_pdf_path(self, book_id: str) -> Path:
         return self.book_dir(book_id) / "original.pdf"
@@ -24,30 +47,93 @@ class StoragePaths:
         return self.book_dir(book_id) / "docling_output.json"
 
     def page_image_path(self, book_id: str, page_number: int) -> Path:
-        return self.book_dir(book_id) / "pages" / f"{page_number}.png"
+        return self.pages_dir(book_id) / f"{page_number}.png"
 
     def page_thumbnail_path(self, book_id: str, page_number: int) -> Path:
-        return self.book_dir(book_id) / "pages" / f"{page_number}_thumb.png"
+        return self.pages_dir(book_id) / f"{page_number}_thumb.png"
 
     def page_pdf_path(self, book_id: str, page_number: int) -> Path:
-        return self.book_dir(book_id) / "pages" / f"{page_number}.pdf"
+        return self.pages_dir(book_id) / f"{page_number}.pdf"
+
+    def asset_path(self, book_id: str, asset_id: str, suffix: str = ".png") -> Path:
+        return self.assets_dir(book_id) / f"{asset_id}{suffix}"
+
+
+# Pages per render task when rendering in worker processes: small enough to
+# balance uneven pages across workers, large enough to amortise opening the PDF.
+RENDER_PAGES_PER_TASK = 8
 
-    def asset_path(self, book_id: str, asset_id: str) -> Path:
-        return self.book_dir(book_id) / "assets" / f"{asset_id}.png"
+
+def _import_fitz():
+    try:
+        import fitz  # PyMuPDF
+    except ImportError as exc:  # pragma: no cover - dependency guard
+        raise RuntimeError("PyMuPDF is required for page rendering. Please install 'pymupdf'.") from exc
+    return fitz
+
+
+def _render_page_range(
+    pdf_path: str,
+    targets: List[Tuple[int, str, Optional[str], Optional[str]]],
+    scale: float,
+    thumb_scale: float,
+) -> None:
+    """
+    Render (page_index, image, thumbnail, single-page pdf) targets. Runs in
+    render worker processes, so it opens its own document: PyMuPDF documents
+    cannot be shared across processes.
+    """
+    fitz = _import_fitz()
+    doc = fitz.open(pdf_path)
+    try:
+        for idx, img_path, thumb_path, page_pdf_path in targets:
+            page = doc.load_page(idx)
+            page.get_pixmap(matrix=fitz.Matrix(scale, scale)).save(img_path)
+            if thumb_path is not None:
+                page.get_pixmap(matrix=fitz.Matrix(thumb_scale, thumb_scale)).save(thumb_path)
+        # Single-page PDFs after the rasters. The copied streams are already
+        # compressed and the new document has nothing to collect, so skip
+        # garbage collection, re-deflation and content cleaning, which are
+        # most of save()'s time.
+        for idx, _img, _thumb, page_pdf_path in targets:
+            if page_pdf_path is None:
+                continue
+            single = fitz.open()
+            try:
+                single.insert_pdf(doc, from_page=idx, to_page=idx)
+                single.save(page_pdf_path, garbage=0, deflate=False, clean=False)
+            finally:
+                single.close()
+    finally:
+        doc.close()
 
 
 class LocalBookStorage:
     """
     Manages filesystem layout for books, parser outputs, and assets.
+
+    With `render_workers > 1`, render_pdf_pages rasterises and PNG-encodes
+    pages in that many spawned processes (chunks of RENDER_PAGES_PER_TASK
+    pages, each opening its own PyMuPDF document). Books of a single chunk
+    are rendered in-process. Spawned workers import this package, Docling
+    included, which takes seconds, so this pays off for long books only.
     """
 
-    def __init__(self, storage_paths: StoragePaths):
+    def __init__(self, storage_paths: StoragePaths, render_workers: int = 1):
         self.paths = storage_paths
+        self.render_workers = render_workers
+        # Books whose directories this instance has created; write_* calls
+        # then skip the mkdir syscalls. delete_book forgets the book again.
+        self._dirs_ensured: Set[str] = set()
+        self._dirs_lock = threading.Lock()
 
     def ensure_base_dirs(self, book_id: str) -> None:
-        base = self.paths.book_dir(book_id)
-        (base / "pages").mkdir(parents=True, exist_ok=True)
-        (base / "assets").mkdir(parents=True, exist_ok=True)
+        if book_id in self._dirs_ensured:
+            return
+        with self._dirs_lock:
+            self.paths.pages_dir(book_id).mkdir(parents=True, exist_ok=True)
+            self.paths.assets_dir(book_id).mkdir(parents=True, exist_ok=True)
+            self._dirs_ensured.add(book_id)
 
     def save_original_pdf(self, book_id: str, source_pdf: Path) -> Path:
         self.ensure_base_dirs(book_id)
@@ -55,24 +141,61 @@ class LocalBookStorage:
         shutil.copy2(source_pdf, target)
         return target
 
-    def write_docling_output(self, book_id: str, parsed_book_json: dict) -> Path:
+    @contextmanager
+    def open_original_pdf(self, book_id: str) -> Iterator[BinaryIO]:
+        """
+        Yield a writable handle for the book's original PDF so callers can
+        stream bytes straight into storage. Data goes to a sibling `.part`
+        file, unique to this call, that is renamed into place on success and
+        removed on error; nothing else of the book is touched on failure.
+        """
+        self.ensure_base_dirs(book_id)
+        target = self.paths.original_pdf_path(book_id)
+        partial = target.with_name(f"{target.name}.{uuid.uuid4().hex}.part")
+        try:
+            with partial.open("wb") as f:
+                yield f
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    def write_docling_output(self, book_id: str, parsed_book_json: Union[dict, bytes, Iterable[bytes]]) -> Path:
+        """
+        Write the engine output. `bytes` are taken as already-encoded UTF-8
+        JSON, and any other iterable as consecutive chunks of it, written as
+        they come so the whole document is never held encoded.
+        """
         self.ensure_base_dirs(book_id)
         target = self.paths.docling_output_path(book_id)
-        with target.open("w", encoding="utf-8") as f:
-            json.dump(parsed_book_json, f, ensure_ascii=False, indent=2)
+        if isinstance(parsed_book_json, dict):
+            parsed_book_json = orjson.dumps(parsed_book_json, option=orjson.OPT_NON_STR_KEYS)
+        if isinstance(parsed_book_json, bytes):
+            target.write_bytes(parsed_book_json)
+            return target
+        with target.open("wb") as f:
+            f.writelines(parsed_book_json)
         return target
 
-    def write_asset_image(self, book_id: str, asset_id: str, data: bytes) -> Path:
+    def write_asset_image(self, book_id: str, asset_id: str, data: bytes, suffix: str = ".png") -> Path:
         self.ensure_base_dirs(book_id)
-        target = self.paths.asset_path(book_id, asset_id)
-        target.write_bytes(data)
+        target = self.paths.asset_path(book_id, asset_id, suffix)
+        # Straight to the fd: skips the buffered file object that
+        # Path.write_bytes builds for every asset.
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+        finally:
+            os.close(fd)
         return target
 
     def page_image_exists(self, book_id: str, page_number: int) -> bool:
         return self.paths.page_image_path(book_id, page_number).exists()
 
-    def asset_exists(self, book_id: str, asset_id: str) -> bool:
-        return self.paths.asset_path(book_id, asset_id).exists()
+    def asset_exists(self, book_id: str, asset_id: str, suffix: str = ".png") -> bool:
+        return self.paths.asset_path(book_id, asset_id, suffix).exists()
 
     def find_original_pdf(self, book_id: str) -> Optional[Path]:
         path = self.paths.original_pdf_path(book_id)
@@ -81,6 +204,8 @@ class LocalBookStorage:
     def delete_book(self, book_id: str) -> None:
         """Remove all stored artifacts for a book."""
         base = self.paths.book_dir(book_id)
+        with self._dirs_lock:
+            self._dirs_ensured.discard(book_id)
         if base.exists():
             shutil.rmtree(base, ignore_errors=True)
 
@@ -97,10 +222,7 @@ class LocalBookStorage:
         Pre-render each page to an image (and optional thumbnail + single-page PDF) once.
         Returns a mapping of page_number -> artifact paths and page size.
         """
-        try:
-            import fitz  # PyMuPDF
-        except ImportError as exc:  # pragma: no cover - dependency guard
-            raise RuntimeError("PyMuPDF is required for page rendering. Please install 'pymupdf'.") from exc
+        fitz = _import_fitz()
 
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF not found for rendering: {pdf_path}")
@@ -108,46 +230,47 @@ class LocalBookStorage:
         self.ensure_base_dirs(book_id)
         artifacts: Dict[int, Dict[str, Optional[Path]]] = {}
 
-        doc = fitz.open(pdf_path)
-        try:
+        with fitz.open(pdf_path) as doc:
             total_pages = doc.page_count
-            if total_pages == 0:
-                raise ValueError(f"PDF has zero pages: {pdf_path}")
-
-            scale = dpi / 72.0
-            thumb_scale_val = scale * thumbnail_scale
-            for idx in range(total_pages):
-                page_number = idx + 1
-                page = doc.load_page(idx)
-
-                # Full-resolution image
-                pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
-                img_path = self.paths.page_image_path(book_id, page_number)
-                img_path.parent.mkdir(parents=True, exist_ok=True)
-                pix.save(img_path)
-
-                thumb_path: Optional[Path] = None
-                if render_thumbnails:
-                    thumb_pix = page.get_pixmap(matrix=fitz.Matrix(thumb_scale_val, thumb_scale_val))
-                    thumb_path = self.paths.page_thumbnail_path(book_id, page_number)
-                    thumb_pix.save(thumb_path)
-
-                page_pdf_path: Optional[Path] = None
-                if write_page_pdfs:
-                    single = fitz.open()
-                    single.insert_pdf(doc, from_page=idx, to_page=idx)
-                    page_pdf_path = self.paths.page_pdf_path(book_id, page_number)
-                    page_pdf_path.parent.mkdir(parents=True, exist_ok=True)
-                    single.save(page_pdf_path)
-                    single.close()
-
-                artifacts[page_number] = {
-                    "image": img_path,
-                    "thumbnail": thumb_path,
-                    "pdf": page_pdf_path,
-                }
-        finally:
-            doc.close()
+        if total_pages == 0:
+            raise ValueError(f"PDF has zero pages: {pdf_path}")
+
+        targets = []
+        for idx in range(total_pages):
+            page_number = idx + 1
+            img_path = self.paths.page_image_path(book_id, page_number)
+            thumb_path = self.paths.page_thumbnail_path(book_id, page_number) if render_thumbnails else None
+            page_pdf_path = self.paths.page_pdf_path(book_id, page_number) if write_page_pdfs else None
+            artifacts[page_number] = {
+                "image": img_path,
+                "thumbnail": thumb_path,
+                "pdf": page_pdf_path,
+            }
+            targets.append(
+                (
+                    idx,
+                    str(img_path),
+                    str(thumb_path) if thumb_path else None,
+                    str(page_pdf_path) if page_pdf_path else None,
+                )
+            )
+
+        scale = dpi / 72.0
+        thumb_scale_val = scale * thumbnail_scale
+        chunks = [targets[i : i + RENDER_PAGES_PER_TASK] for i in range(0, total_pages, RENDER_PAGES_PER_TASK)]
+        if self.render_workers <= 1 or len(chunks) == 1:
+            _render_page_range(str(pdf_path), targets, scale, thumb_scale_val)
+        else:
+            # spawn: the worker process may already hold torch/onnx threads.
+            with ProcessPoolExecutor(
+                max_workers=min(self.render_workers, len(chunks)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                futures = [
+                    pool.submit(_render_page_range, str(pdf_path), chunk, scale, thumb_scale_val) for chunk in chunks
+                ]
+                for future in futures:
+                    future.result()
 
         # Validate coverage
         missing_pages = [p for p in range(1, total_pages + 1) if p not in artifacts]
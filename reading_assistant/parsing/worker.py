@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
 
 from .engine import ParsingEngine
 from .indexing import Indexer
@@ -16,18 +21,61 @@ from .models import (
     ParsedAsset,
     ParsedBlock,
     ParsedBook,
+    ParsedPage,
     ParsedSection,
     SectionRecord,
 )
-from .repository import ParsingRepository
+from .repository import BLOCK_ROW_FIELDS, ParsingRepository
+from .serialization import encode_page_payload
 from .storage import LocalBookStorage
 
+# File suffix for asset images by the MIME type the engine recorded; PNG if unset.
+_ASSET_SUFFIXES = {"image/webp": ".webp", "image/png": ".png"}
+
+
+class _ProgressWriter:
+    """
+    Throttles a job's `current_page` writes to one per `interval_s`. The
+    recorded page only ever lags the ingested pages, so it stays a safe resume
+    point; flush() writes the latest value out.
+    """
+
+    def __init__(self, repo: ParsingRepository, job_id: str, interval_s: float):
+        self.repo = repo
+        self.job_id = job_id
+        self.interval_s = interval_s
+        self._pending: Optional[int] = None
+        self._last_write = float("-inf")
+
+    def set(self, page_number: int) -> None:
+        self._pending = page_number
+        if time.monotonic() - self._last_write >= self.interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending is None:
+            return
+        self.repo.update_job_state_phase(self.job_id, current_page=self._pending)
+        self._pending = None
+        self._last_write = time.monotonic()
+
 
 class ParsingWorker:
     """
     Drives a parse job through precheck -> parse -> DB ingestion -> indexing.
     The worker is stateless and relies on the repository for job/book state
     and on the storage adapter for filesystem operations.
+
+    With `overlap_ingestion`, each page's DB writes run on a background
+    thread while the next page is mapped (block records, payload encoding,
+    asset files), so CPU work overlaps with database round-trips. Pages are
+    still written one at a time and in order, so `current_page` stays a safe
+    resume point. Disable it for repositories bound to a single thread, such
+    as an in-memory SQLite database.
+
+    `current_page` is written at most every `progress_interval_s` during
+    ingestion, and always before the worker stops or moves on to indexing.
+    Pass 0 to write it after every page.
     """
 
     def __init__(
@@ -39,6 +87,8 @@ class ParsingWorker:
         batch_size: int = 50,
         persist_engine_output: bool = True,
         render_page_previews: bool = True,
+        overlap_ingestion: bool = True,
+        progress_interval_s: float = 0.5,
     ):
         self.repo = repository
         self.storage = storage
@@ -47,6 +97,8 @@ class ParsingWorker:
         self.batch_size = batch_size
         self.persist_engine_output = persist_engine_output
         self.render_page_previews = render_page_previews
+        self.overlap_ingestion = overlap_ingestion
+        self.progress_interval_s = progress_interval_s
 
     def run_job(self, job_id: str) -> None:
         job = self.repo.get_job(job_id)
@@ -59,6 +111,9 @@ class ParsingWorker:
             return
 
         pdf_path = self._locate_pdf(book.original_file_path, book.id)
+        # Nothing has been ingested for a freshly uploaded book, so its blocks
+        # can take the bulk COPY path instead of the upsert.
+        first_ingestion = book.status == BookStatus.UPLOADED
         try:
             self.repo.update_job_state_phase(job_id, state=ParseJobState.RUNNING, phase=ParseJobPhase.PRECHECK)
             self.repo.update_book_status(book.id, BookStatus.PARSING)
@@ -69,38 +124,47 @@ class ParsingWorker:
             self.repo.update_book_status(book.id, BookStatus.PARSING, page_count=page_count)
             self.repo.update_job_state_phase(job_id, total_pages=page_count)
 
-            page_artifacts = None
-            if self.render_page_previews:
-                page_artifacts = self.storage.render_pdf_pages(book.id, pdf_path)
-                if len(page_artifacts) != page_count:
-                    raise RuntimeError(
-                        f"Rendered page artifacts mismatch: expected {page_count}, got {len(page_artifacts)}"
-                    )
-
-            self.repo.update_job_state_phase(job_id, phase=ParseJobPhase.DOCLING_PARSE)
-            if self._should_stop(job_id):
-                return
-            parsed_book = self.engine.parse(pdf_path)
+            # Page previews and the engine both only read the PDF, so render
+            # on a side thread while the engine parses.
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="render") as renderer:
+                render_future = (
+                    renderer.submit(self.storage.render_pdf_pages, book.id, pdf_path)
+                    if self.render_page_previews
+                    else None
+                )
+                self.repo.update_job_state_phase(job_id, phase=ParseJobPhase.DOCLING_PARSE)
+                if self._should_stop(job_id):
+                    return
+                parsed_book = self.engine.parse(pdf_path)
+                page_artifacts = render_future.result() if render_future is not None else None
+            if page_artifacts is not None and len(page_artifacts) != page_count:
+                raise RuntimeError(
+                    f"Rendered page artifacts mismatch: expected {page_count}, got {len(page_artifacts)}"
+                )
             if self._should_stop(job_id):
                 return
 
             if self.persist_engine_output:
-                self.storage.write_docling_output(book.id, json.loads(json.dumps(parsed_book, default=self._json_default)))
+                self.storage.write_docling_output(book.id, self._iter_engine_output(parsed_book))
 
             self.repo.update_job_state_phase(job_id, phase=ParseJobPhase.DB_INGESTION)
+            if first_ingestion:
+                # One delete up front (normally a no-op) instead of one per page.
+                self.repo.clear_blocks_for_book(book.id)
             self._ingest_parsed_book(
                 job_id,
                 book.id,
                 parsed_book,
                 resume_from_page=job.current_page,
                 page_artifacts=page_artifacts,
+                first_ingestion=first_ingestion,
             )
             if self._should_stop(job_id):
                 return
 
             self.repo.update_job_state_phase(job_id, phase=ParseJobPhase.INDEXING)
-            blocks = self.repo.list_blocks_for_book(book.id)
-            self.indexer.index_book(book.id, blocks)
+            self.indexer.index_book(book.id, self.repo.iter_blocks_for_book(book.id), parallel=first_ingestion)
+            self.indexer.flush()
             if self._should_stop(job_id):
                 return
 
@@ -122,7 +186,38 @@ class ParsingWorker:
         count = self.engine.count_pages(pdf_path)
         return count
 
+    def _iter_engine_output(self, parsed_book: ParsedBook) -> Iterator[bytes]:
+        """
+        The book as compact JSON, in chunks: the same bytes as one orjson.dumps
+        of the whole book, but encoded an item at a time so a big book's JSON
+        never sits in memory next to the book itself.
+        """
+
+        def dumps(value) -> bytes:
+            return orjson.dumps(
+                value,
+                default=self._json_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+
+        opener = b"{"
+        for f in fields(parsed_book):
+            value = getattr(parsed_book, f.name)
+            yield opener + dumps(f.name) + b":"
+            opener = b","
+            if not isinstance(value, list):
+                yield dumps(value)
+                continue
+            yield b"["
+            for i, item in enumerate(value):
+                yield b"," + dumps(item) if i else dumps(item)
+            yield b"]"
+        yield b"}"
+
     def _json_default(self, obj):
+        if is_dataclass(obj):
+            # Slotted dataclasses have no __dict__; nested values recurse through here.
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
         if hasattr(obj, "__dict__"):
             return obj.__dict__
         return str(obj)
@@ -134,70 +229,129 @@ class ParsingWorker:
         parsed_book: ParsedBook,
         resume_from_page: int = 0,
         page_artifacts: Optional[Dict[int, Dict[str, Path]]] = None,
+        first_ingestion: bool = False,
     ) -> None:
         pages_sorted = sorted(parsed_book.pages, key=lambda p: p.page_number)
         sections_sorted = sorted(parsed_book.sections, key=lambda s: s.order_index if hasattr(s, "order_index") else 0)
         page_id_map: Dict[int, str] = {}
         section_id_map: Dict[str, str] = {}
+        # Bucket blocks and assets by page in one pass rather than scanning
+        # the whole book for every page.
+        blocks_by_page: Dict[int, List[ParsedBlock]] = {}
+        for block in parsed_book.blocks:
+            blocks_by_page.setdefault(block.page_number, []).append(block)
+        assets_by_page: Dict[int, List[ParsedAsset]] = {}
+        for asset in parsed_book.assets:
+            assets_by_page.setdefault(asset.page_number, []).append(asset)
 
         # Sections are book-level, so we upsert them once.
         section_records = self._map_sections(book_id, sections_sorted, section_id_map)
         if section_records:
             self.repo.upsert_sections(section_records)
 
-        batch_pages: List[PageRecord] = []
-        batch_blocks: List[BlockRecord] = []
-        batch_assets: List[AssetRecord] = []
-        last_page_ingested = resume_from_page
+        # Asset images are written per page below; create the directories once.
+        self.storage.ensure_base_dirs(book_id)
+        progress = _ProgressWriter(self.repo, job_id, self.progress_interval_s)
+        pending: Optional[Future] = None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest") as writer:
+            for page in pages_sorted:
+                if page.page_number <= resume_from_page:
+                    continue
+                page_id = f"{book_id}-p{page.page_number}"
+                page_id_map[page.page_number] = page_id
+                batch = self._map_page(
+                    book_id,
+                    page_id,
+                    page,
+                    blocks_by_page.get(page.page_number, []),
+                    assets_by_page.get(page.page_number, []),
+                    section_id_map,
+                    page_artifacts,
+                )
+                if pending is not None:
+                    pending.result()
+                    if self._should_stop(job_id):
+                        progress.flush()
+                        return
+                args = (progress, book_id, page.page_number, *batch, first_ingestion)
+                if self.overlap_ingestion:
+                    pending = writer.submit(self._write_page, *args)
+                else:
+                    self._write_page(*args)
+                    if self._should_stop(job_id):
+                        progress.flush()
+                        return
+            if pending is not None:
+                pending.result()
+        progress.flush()
 
-        for page in pages_sorted:
-            if page.page_number <= resume_from_page:
-                continue
-            page_id = f"{book_id}-p{page.page_number}"
-            page_id_map[page.page_number] = page_id
-            artifacts = page_artifacts.get(page.page_number) if page_artifacts is not None else None
-            if page_artifacts is not None and (artifacts is None or not artifacts.get("image")):
-                raise RuntimeError(f"Missing rendered page image for book {book_id} page {page.page_number}")
-            page_record = PageRecord(
-                id=page_id,
-                book_id=book_id,
-                page_number=page.page_number,
-                width=page.width,
-                height=page.height,
-                render_image_path=str(artifacts.get("image")) if artifacts and artifacts.get("image") else None,
-                thumbnail_image_path=str(artifacts.get("thumbnail")) if artifacts and artifacts.get("thumbnail") else None,
-                parse_status="parsed",
-            )
-            batch_pages.append(page_record)
-
-            related_blocks = [b for b in parsed_book.blocks if b.page_number == page.page_number]
-            block_records, asset_owner_map = self._map_blocks(
-                book_id=book_id,
-                page_id=page_id,
-                blocks=related_blocks,
-                section_id_map=section_id_map,
-            )
-            batch_blocks.extend(block_records)
-
-            related_assets = [a for a in parsed_book.assets if a.page_number == page.page_number]
-            asset_records = self._map_assets(book_id, page_id, related_assets, asset_owner_map)
-            batch_assets.extend(asset_records)
-
-            # Commit per page to keep progress current and avoid stale 0/N.
-            self.repo.upsert_pages(batch_pages)
-            self.repo.upsert_blocks(batch_blocks)
-            self.repo.upsert_assets(batch_assets)
-            last_page_ingested = page.page_number
-            self.repo.update_job_state_phase(job_id, current_page=last_page_ingested)
-            batch_pages, batch_blocks, batch_assets = [], [], []
-            if self._should_stop(job_id):
-                return
+    def _map_page(
+        self,
+        book_id: str,
+        page_id: str,
+        page: ParsedPage,
+        related_blocks: List[ParsedBlock],
+        related_assets: List[ParsedAsset],
+        section_id_map: Dict[str, str],
+        page_artifacts: Optional[Dict[int, Dict[str, Path]]],
+    ) -> Tuple[PageRecord, List[BlockRecord], List[AssetRecord]]:
+        artifacts = page_artifacts.get(page.page_number) if page_artifacts is not None else None
+        if page_artifacts is not None and (artifacts is None or not artifacts.get("image")):
+            raise RuntimeError(f"Missing rendered page image for book {book_id} page {page.page_number}")
+        # One timestamp for every record of the page instead of two utcnow()
+        # calls per record from the dataclass defaults.
+        now = datetime.utcnow()
+        page_record = PageRecord(
+            id=page_id,
+            book_id=book_id,
+            page_number=page.page_number,
+            width=page.width,
+            height=page.height,
+            render_image_path=str(artifacts.get("image")) if artifacts and artifacts.get("image") else None,
+            thumbnail_image_path=str(artifacts.get("thumbnail")) if artifacts and artifacts.get("thumbnail") else None,
+            parse_status="parsed",
+            created_at=now,
+            updated_at=now,
+        )
+
+        block_records, asset_owner_map = self._map_blocks(
+            book_id=book_id,
+            page_id=page_id,
+            blocks=related_blocks,
+            section_id_map=section_id_map,
+            now=now,
+        )
+        # Encode the read-path payload once here instead of on every API request.
+        page_record.parsed_json = encode_page_payload(
+            page.page_number,
+            page.width,
+            page.height,
+            [
+                tuple(getattr(record, name) for name in BLOCK_ROW_FIELDS)
+                for record in sorted(block_records, key=lambda r: r.reading_order)
+            ],
+        )
+
+        asset_records = self._map_assets(book_id, page_id, related_assets, asset_owner_map, now)
+        return page_record, block_records, asset_records
 
-        # No-op: batches are flushed per page above.
+    def _write_page(
+        self,
+        progress: _ProgressWriter,
+        book_id: str,
+        page_number: int,
+        page_record: PageRecord,
+        block_records: List[BlockRecord],
+        asset_records: List[AssetRecord],
+        first_ingestion: bool,
+    ) -> None:
+        # Commit per page so a stop loses at most the page in flight.
+        self.repo.upsert_page_batch(book_id, [page_record], block_records, asset_records, bulk_copy=first_ingestion)
+        progress.set(page_number)
 
     def _should_stop(self, job_id: str) -> bool:
-        job = self.repo.get_job(job_id)
-        return bool(job and job.state in {ParseJobState.PAUSED, ParseJobState.FAILED})
+        # Pauses come from the API process, so this has to ask the repository.
+        return self.repo.get_job_state(job_id) in {ParseJobState.PAUSED, ParseJobState.FAILED}
 
     def _map_sections(
         self,
@@ -206,6 +360,7 @@ class ParsingWorker:
         section_id_map: Dict[str, str],
     ) -> List[SectionRecord]:
         records: List[SectionRecord] = []
+        now = datetime.utcnow()
         for section in parsed_sections:
             record_id = f"{book_id}-sec-{section.id}"
             section_id_map[section.id] = record_id
@@ -222,6 +377,8 @@ class ParsingWorker:
                     start_page_number=section.start_page_number,
                     end_page_number=section.end_page_number,
                     order_index=section.order_index,
+                    created_at=now,
+                    updated_at=now,
                 )
             )
         return records
@@ -232,31 +389,39 @@ class ParsingWorker:
         page_id: str,
         blocks: List[ParsedBlock],
         section_id_map: Dict[str, str],
+        now: datetime,
     ) -> Tuple[List[BlockRecord], Dict[str, str]]:
         records: List[BlockRecord] = []
+        append = records.append
         asset_owner_map: Dict[str, str] = {}
+        block_prefix = f"{book_id}-blk-"
+        asset_prefix = f"{book_id}-asset-"
         for block in blocks:
-            block_id = f"{book_id}-blk-{block.id}"
+            block_id = block_prefix + block.id
             section_id = self._resolve_section(block, section_id_map)
-            asset_ref = f"{book_id}-asset-{block.asset_id}" if block.asset_id else None
+            asset_ref = asset_prefix + block.asset_id if block.asset_id else None
             if asset_ref:
                 asset_owner_map[asset_ref] = block_id
-            records.append(
+            bbox = block.bbox
+            # Positional, in BlockRecord field order: this runs once per block.
+            append(
                 BlockRecord(
-                    id=block_id,
-                    book_id=book_id,
-                    page_id=page_id,
-                    section_id=section_id,
-                    block_type=block.block_type,
-                    text=block.text,
-                    markup=block.markup,
-                    bbox_x=block.bbox.x,
-                    bbox_y=block.bbox.y,
-                    bbox_w=block.bbox.w,
-                    bbox_h=block.bbox.h,
-                    reading_order=block.reading_order,
-                    asset_id=asset_ref,
-                    source_id=block.source_id,
+                    block_id,
+                    book_id,
+                    page_id,
+                    section_id,
+                    block.block_type,
+                    block.text,
+                    block.markup,
+                    bbox.x,
+                    bbox.y,
+                    bbox.w,
+                    bbox.h,
+                    block.reading_order,
+                    asset_ref,
+                    block.source_id,
+                    now,
+                    now,
                 )
             )
         return records, asset_owner_map
@@ -267,13 +432,15 @@ class ParsingWorker:
         page_id: str,
         assets: List[ParsedAsset],
         asset_owner_map: Dict[str, str],
+        now: datetime,
     ) -> List[AssetRecord]:
         records: List[AssetRecord] = []
         for asset in assets:
             asset_id = f"{book_id}-asset-{asset.id}"
             file_path = ""
             if asset.image_bytes:
-                path = self.storage.write_asset_image(book_id, asset_id, asset.image_bytes)
+                suffix = _ASSET_SUFFIXES.get(asset.metadata.get("mime_type"), ".png")
+                path = self.storage.write_asset_image(book_id, asset_id, asset.image_bytes, suffix)
                 file_path = str(path)
             elif asset.image_path:
                 file_path = str(asset.image_path)
@@ -289,6 +456,8 @@ class ParsingWorker:
                     bbox_w=asset.bbox.w,
                     bbox_h=asset.bbox.h,
                     block_id=asset_owner_map.get(asset_id),
+                    created_at=now,
+                    updated_at=now,
                 )
             )
         return records
@@ -0,0 +1,53 @@
+"""
+Start RQ workers that consume parse jobs enqueued by the API.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/0 WORKER_CONCURRENCY=4 python3 run_worker.py
+
+Each worker runs in its own process, so N workers parse N books in parallel.
+Jobs run inside that process (rq SimpleWorker), so the Docling/OCR models
+loaded by the first job are reused by the following ones. Equivalent to
+running `rq worker parse-jobs --url $REDIS_URL --with-scheduler
+--worker-class rq.SimpleWorker` N times under supervisord / docker compose.
+"""
+
+import argparse
+import multiprocessing
+import os
+
+from reading_assistant.parsing import RQJobQueue
+
+
+def _work(redis_url: str, queue_name: str) -> None:
+    # Connections are created inside the child so nothing is shared across fork.
+    RQJobQueue(redis_url=redis_url, queue_name=queue_name).work()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"), help="Redis URL")
+    parser.add_argument("--queue", default=os.getenv("PARSE_QUEUE_NAME", "parse-jobs"), help="RQ queue name")
+    parser.add_argument(
+        "--concurrency",
+        default=int(os.getenv("WORKER_CONCURRENCY", "1")),
+        type=int,
+        help="Number of worker processes to start",
+    )
+    args = parser.parse_args()
+
+    if args.concurrency <= 1:
+        _work(args.url, args.queue)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_work, args=(args.url, args.queue), name=f"parse-worker-{i}")
+        for i in range(args.concurrency)
+    ]
+    for proc in processes:
+        proc.start()
+    for proc in processes:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
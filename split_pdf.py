@@ -24,8 +24,10 @@ def extract_first_n_pages(input_pdf_path, output_pdf_path, num_pages=10):
             to_page=pages_to_extract - 1
         )
         
-        # 4. Save the new document
-        output_doc.save(output_pdf_path)
+        # 4. Save the new document. The copied streams are already compressed and
+        # the new document holds only what insert_pdf copied, so skip garbage
+        # collection, re-deflation and content cleaning.
+        output_doc.save(output_pdf_path, garbage=0, deflate=False, clean=False)
         
         # 5. Close the documents
         source_doc.close()
@@ -45,4 +47,5 @@ INPUT_FILE = "input.pdf"
 OUTPUT_FILE = "test1.pdf"
 PAGES_TO_EXTRACT = 10
 
-extract_first_n_pages(INPUT_FILE, OUTPUT_FILE, PAGES_TO_EXTRACT)
\ No newline at end of file
+if __name__ == "__main__":
+    extract_first_n_pages(INPUT_FILE, OUTPUT_FILE, PAGES_TO_EXTRACT)
\ No newline at end of file
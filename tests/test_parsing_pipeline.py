@@ -1,6 +1,9 @@
+from dataclasses import replace
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -11,6 +14,7 @@ from reading_assistant.parsing import (
     DummyParsingEngine,
     InMemoryParsingRepository,
     LocalBookStorage,
+    LocalParseCache,
     NoopIndexer,
     PageRecord,
     ParseJobPhase,
@@ -22,13 +26,14 @@ from reading_assistant.parsing import (
     StoragePaths,
     WhooshIndexer,
 )
-from reading_assistant.parsing.engine import DoclingParsingEngine
-from reading_assistant.parsing.models import BBox
+from reading_assistant.parsing.engine import DoclingParsingEngine, _merge_page_ranges
+from reading_assistant.parsing.models import BBox, ParsedAsset, ParsedBlock, ParsedBook, ParsedPage, ParsedSection
 
 
 def test_sqlalchemy_repository_roundtrip(tmp_path):
     db_path = tmp_path / "test.db"
     repo = SqlAlchemyParsingRepository(f"sqlite+pysqlite:///{db_path}")
+    now = datetime.utcnow()
 
     book = BookRecord(
         id="book-1",
@@ -52,7 +57,7 @@ def test_sqlalchemy_repository_roundtrip(tmp_path):
         state=ParseJobState.QUEUED,
         phase=ParseJobPhase.PRECHECK,
         current_page=0,
-        started_at=datetime.utcnow(),
+        started_at=now,
     )
     repo.save_job(job)
     repo.update_job_state_phase(job.id, state=ParseJobState.RUNNING, current_page=2, total_pages=10, error_message=None)
@@ -68,8 +73,8 @@ def test_sqlalchemy_repository_roundtrip(tmp_path):
         render_image_path=None,
         thumbnail_image_path=None,
         parse_status="parsed",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=now,
+        updated_at=now,
     )
     section = SectionRecord(
         id="sec-1",
@@ -80,8 +85,8 @@ def test_sqlalchemy_repository_roundtrip(tmp_path):
         start_page_number=1,
         end_page_number=1,
         order_index=0,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=now,
+        updated_at=now,
     )
     block = BlockRecord(
         id="blk-1",
@@ -98,8 +103,8 @@ def test_sqlalchemy_repository_roundtrip(tmp_path):
         reading_order=0,
         asset_id=None,
         source_id="src-1",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=now,
+        updated_at=now,
     )
     repo.upsert_pages([page])
     repo.upsert_sections([section])
@@ -107,6 +112,19 @@ def test_sqlalchemy_repository_roundtrip(tmp_path):
     blocks = repo.list_blocks_for_book(book.id)
     assert len(blocks) == 1
     assert blocks[0].text == "Hello"
+    assert blocks[0].created_at == blocks[0].updated_at == now
+    rows = repo.list_block_rows_for_page(book.id, 1)
+    assert [(r[0], r[3]) for r in rows] == [("blk-1", "Hello")]
+    batch = repo.list_blocks_batch(book.id)
+    assert list(batch.ids) == ["blk-1"] and batch.bbox.shape == (1, 4)
+
+    # More rows than one insertmanyvalues page, inserted and then updated.
+    many = [replace(block, id=f"blk-many-{i}", reading_order=i + 1) for i in range(2000)]
+    repo.upsert_blocks(many)
+    repo.upsert_blocks([replace(b, text="Updated") for b in many])
+    blocks = repo.list_blocks_for_book(book.id)
+    assert len(blocks) == 2001
+    assert sum(b.text == "Updated" for b in blocks) == 2000
 
 
 def test_worker_ingests_dummy_engine(tmp_path):
@@ -126,6 +144,7 @@ def test_worker_ingests_dummy_engine(tmp_path):
 
     sample_pdf = tmp_path / "sample.txt"
     sample_pdf.write_text("Paragraph one.\n\nParagraph two.", encoding="utf-8")
+    assert engine.parse_bytes(sample_pdf.read_bytes()) == engine.parse(sample_pdf)
 
     book = BookRecord(
         id="book-1",
@@ -160,6 +179,7 @@ def test_worker_ingests_dummy_engine(tmp_path):
     assert len(blocks) == 2
     docling_out = storage.paths.docling_output_path(book.id)
     assert docling_out.exists()
+    assert len(json.loads(docling_out.read_bytes())["blocks"]) == 2
 
 
 def test_whoosh_indexer(tmp_path):
@@ -208,6 +228,29 @@ def test_whoosh_indexer(tmp_path):
     assert len(results) == 1
     assert results[0]["block_id"] == "blk-1"
 
+    other = replace(blocks[0], id="blk-9", book_id="book-2", text="quick silver")
+    indexer.index_books_bulk({"book-1": blocks[1:], "book-2": [other]})
+    results = indexer.search("quick")
+    assert [hit["block_id"] for hit in results] == ["blk-9"]
+    assert indexer.search("quick", fields=("block_id", "page_number")) == [("blk-9", 0)]
+
+    indexer.start_writer_thread(batch_size=1)
+    indexer.index_book("book-2", [replace(other, text="slow silver")])
+    indexer.flush()
+    assert indexer.search("quick") == []
+    indexer.index_book("book-2", [replace(other, text="quick again")], mode="incremental")
+    indexer.flush()
+    assert [hit["text"] for hit in indexer.search("quick")] == ["quick again"]
+    indexer.close()
+
+    # A book-sized load goes through one writer and one commit.
+    large = WhooshIndexer(tmp_path / "whoosh-large")
+    many = [replace(blocks[1], id=f"blk-{i}", book_id="book-3", reading_order=i) for i in range(10_000)]
+    many[7_777] = replace(many[7_777], text="a quick note")
+    large.index_book("book-3", many)
+    assert [hit["block_id"] for hit in large.search("quick")] == ["blk-7777"]
+    assert len(large.search("lazy", limit=None)) == 9_999
+
 
 def test_docling_bbox_coercion_variants():
     engine = DoclingParsingEngine.__new__(DoclingParsingEngine)
@@ -223,3 +266,145 @@ def test_docling_bbox_coercion_variants():
     converted = engine._coerce_bbox(bbox_dict_like)
     assert converted == BBox(1, 2, 3, 4)
 
+
+def test_page_range_merge_keeps_ids_unique():
+    def range_result(page_number):
+        # Every range is its own Docling document, so refs restart at 0.
+        bbox = BBox(0, 0, 10, 10)
+        return (
+            [ParsedPage(page_number=page_number, width=612.0, height=792.0)],
+            [ParsedSection("#/texts/0", None, 1, "Heading", page_number, page_number, 0)],
+            [
+                ParsedBlock("#/texts/0", page_number, "section_header", "Heading", bbox, 0, source_id="#/texts/0"),
+                ParsedBlock("#/pictures/0", page_number, "picture", "", bbox, 1, asset_id="#/pictures/0"),
+            ],
+            [ParsedAsset("#/pictures/0", page_number, "picture", bbox)],
+        )
+
+    pages, sections, blocks, assets = _merge_page_ranges([(1, 1), (2, 2)], [range_result(1), range_result(2)])
+
+    assert [p.page_number for p in pages] == [1, 2]
+    assert len({s.id for s in sections}) == 2
+    assert [s.order_index for s in sections] == [0, 1]
+    assert len({b.id for b in blocks}) == 4
+    assert [b.reading_order for b in blocks] == [0, 1, 2, 3]
+    assert len({a.id for a in assets}) == 2
+    # References inside a range follow its ids.
+    assert [b.asset_id for b in blocks if b.asset_id] == [a.id for a in assets]
+    assert [b.source_id for b in blocks if b.source_id] == [b.id for b in blocks if b.block_type == "section_header"]
+
+
+def test_docling_parse_many_gates_per_file_and_uses_cache(tmp_path, monkeypatch):
+    from docling.datamodel.base_models import ConversionStatus
+
+    import reading_assistant.parsing.engine as engine_module
+
+    empty_document = SimpleNamespace(pages={}, pictures=[], tables=[], iterate_items=lambda **kwargs: iter(()))
+
+    class StubConverter:
+        def __init__(self):
+            self.calls = []
+
+        def convert_all(self, paths, raises_on_error=False):
+            for path in paths:
+                self.calls.append(("batch", path.name))
+                failed = path.name == "bad.pdf"
+                status = ConversionStatus.FAILURE if failed else ConversionStatus.SUCCESS
+                yield SimpleNamespace(status=status, document=empty_document)
+
+        def convert(self, source, **kwargs):
+            self.calls.append(("single", source.name))
+            return SimpleNamespace(status=ConversionStatus.SUCCESS, document=empty_document)
+
+    class DictCache:
+        def __init__(self):
+            self.entries = {}
+
+        def get(self, key):
+            return self.entries.get(key)
+
+        def put(self, key, book):
+            self.entries[key] = book
+
+    # One OCR slot: re-taking it while a batch holds it would hang.
+    monkeypatch.setattr(engine_module, "_OCR_GATE", engine_module._OcrGate(concurrency=1))
+    engine = DoclingParsingEngine.__new__(DoclingParsingEngine)
+    engine.converter = StubConverter()
+    engine.cache = DictCache()
+    engine.perform_ocr = True
+    engine.page_workers = 1
+    engine.pages_per_chunk = 16
+    engine.engine_version = "stub"
+    engine._settings = "stub-settings"
+    engine.backend_fallback = False
+    engine.generate_images = False
+    paths = []
+    for name in ("good.pdf", "bad.pdf"):
+        path = tmp_path / name
+        path.write_bytes(name.encode("utf-8"))
+        paths.append(path)
+
+    outcome = {}
+    thread = threading.Thread(
+        target=lambda: outcome.setdefault("books", list(engine.parse_many(paths))), daemon=True
+    )
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "parse_many deadlocked on the OCR gate"
+    assert len(outcome["books"]) == 2
+    # The failed batch file is converted again on its own.
+    assert engine.converter.calls == [("batch", "good.pdf"), ("batch", "bad.pdf"), ("single", "bad.pdf")]
+    assert len(engine.cache.entries) == 2
+
+    engine.converter.calls.clear()
+    assert len(list(engine.parse_many(paths))) == 2
+    assert engine.converter.calls == []
+
+
+def test_local_parse_cache_roundtrip_and_corrupt_entries(tmp_path):
+    cache = LocalParseCache(tmp_path / "cache")
+    page = ParsedPage(page_number=1, width=612.0, height=792.0)
+    block = ParsedBlock("b1", 1, "text", "Hello", BBox(0, 0, 10, 10), 0)
+    book = ParsedBook(pages=[page], sections=[], blocks=[block], assets=[], engine_version="test")
+
+    assert cache.get("missing") is None
+    cache.put("k", book)
+    assert cache.get("k") == book
+    # Only the entry is left behind, no partial files.
+    assert [p.name for p in cache.cache_dir.iterdir()] == ["k.pkl"]
+
+    (cache.cache_dir / "k.pkl").write_bytes(b"not a pickle")
+    assert cache.get("k") is None
+
+    # A failed write is logged and skipped, not raised into the parse.
+    cache.put("bad", SimpleNamespace(unpicklable=lambda: None))
+    assert cache.get("bad") is None
+    assert sorted(p.name for p in cache.cache_dir.iterdir()) == ["k.pkl"]
+
+
+def test_page_cache_serves_reparsed_pages_after_clear(monkeypatch):
+    from api.routes import documents
+
+    repo = InMemoryParsingRepository()
+
+    def store_page(payload):
+        repo.upsert_pages([PageRecord("p1", "book-1", 1, 612.0, 792.0, None, None, "parsed", parsed_json=payload)])
+
+    def fetch():
+        return documents.get_parsed_page("book-1", 1, repo=repo).body
+
+    documents.clear_page_cache()
+    store_page(b'{"v": 1}')
+    assert fetch() == b'{"v": 1}'
+
+    # A reparse in this process clears the cache; until then the old page is kept.
+    store_page(b'{"v": 2}')
+    assert fetch() == b'{"v": 1}'
+    documents.clear_page_cache()
+    assert fetch() == b'{"v": 2}'
+
+    # With the TTL at 0 nothing is cached.
+    monkeypatch.setattr(documents, "PAGE_CACHE_TTL_S", 0)
+    store_page(b'{"v": 3}')
+    assert fetch() == b'{"v": 3}'
+    documents.clear_page_cache()